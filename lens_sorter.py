@@ -7,16 +7,54 @@
 """
 
 import argparse
+import errno
+import functools
+import json
 import logging
+import math
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 
+# EXIF 日期時間，例如 "2025:02:26 07:41:04" 或 "2025-02-26T07:41:04+08:00"
+# 與 strptime 一樣接受未補零的欄位 ("2025:2:26 7:41:04") 以及日期與時間之間的多個空白
+DATE_RE = re.compile(
+    r'(\d{4})[:-](\d{1,2})[:-](\d{1,2})[\sT]+(\d{1,2}):(\d{1,2}):(\d{1,2})'
+)
+
+# 選用套件：未安裝時退回較慢或較簡單的做法
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
 
 class ProgressLogger:
     """處理 logging 和進度顯示"""
     
-    def __init__(self, log_file: Path, verbose: bool = False):
+    def __init__(self, log_file: Path, verbose: bool = False, log_level: int = logging.DEBUG):
         self.log_file = log_file
         self.verbose = verbose
         self.stats = {
@@ -25,10 +63,12 @@ class ProgressLogger:
             'errors': 0,
             'warnings': 0,
         }
+        # 縮圖在 thread pool 中產生，警告計數需要加鎖
+        self._stats_lock = threading.Lock()
         
-        # 設定 file logger
+        # 設定 file logger（預設記錄 DEBUG，包含每個檔案的處理細節）
         logging.basicConfig(
-            level=logging.DEBUG,
+            level=log_level,
             format='%(asctime)s [%(levelname)s] %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S',
             handlers=[
@@ -52,19 +92,25 @@ class ProgressLogger:
             print(f"  {message}")
     
     def warning(self, message: str):
-        self.stats['warnings'] += 1
+        with self._stats_lock:
+            self.stats['warnings'] += 1
         self.logger.warning(message)
         if not self.verbose:
             print(f"⚠️  {message}")
     
     def error(self, message: str):
-        self.stats['errors'] += 1
+        with self._stats_lock:
+            self.stats['errors'] += 1
         self.logger.error(message)
         print(f"❌ {message}")
     
     def debug(self, message: str):
         self.logger.debug(message)
     
+    def is_debug_enabled(self) -> bool:
+        """是否會記錄 debug 訊息；log 等級為 INFO 以上時可在 hot loop 中略過訊息格式化"""
+        return self.logger.isEnabledFor(logging.DEBUG)
+    
     def generate_report(self) -> str:
         """產生最終報告"""
         return f"""
@@ -80,111 +126,380 @@ class ProgressLogger:
 """
 
 
+def _run_exiftool_batch(paths: list, speed_flag: str, exiftool_args: list) -> tuple:
+    """以單次 exiftool 呼叫讀取一組檔案，回傳 (JSON 結果, 錯誤訊息)
+    
+    會在子行程中執行，因此不寫 log，錯誤訊息交回主行程處理。
+    """
+    # 將所有路徑寫入 argfile，避免命令列長度限制
+    with tempfile.NamedTemporaryFile('w', suffix='.args', encoding='utf-8',
+                                     delete=False) as f:
+        f.write('\n'.join(str(p) for p in paths) + '\n')
+        argfile = f.name
+    
+    try:
+        result = subprocess.run(
+            ['exiftool', speed_flag, '-charset', 'filename=utf8',
+             *exiftool_args, '-@', argfile],
+            capture_output=True,
+            text=True,
+            timeout=30 + len(paths)
+        )
+    except subprocess.TimeoutExpired:
+        return [], "exiftool 超時"
+    except Exception as e:
+        return [], str(e)
+    finally:
+        os.unlink(argfile)
+    
+    # 部分檔案失敗時 returncode 不為 0，但 stdout 仍包含其他檔案的結果
+    try:
+        data = json.loads(result.stdout) if result.stdout.strip() else []
+    except ValueError as e:
+        return [], f"無法解析 exiftool 輸出: {e}"
+    
+    return data, None
+
+
+def _read_json(path: Path):
+    """讀取 JSON 檔，有安裝 orjson 時使用較快的 orjson"""
+    if not ORJSON_AVAILABLE:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _write_json(path: Path, data):
+    """寫入 JSON 檔 (UTF-8、縮排 2)，有安裝 orjson 時使用較快的 orjson"""
+    if not ORJSON_AVAILABLE:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return
+    
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_parts(year: int, month: int, day: int) -> tuple:
+    """回傳 (YYYY, MM, DD, YYYY-MM-DD) 字串；同一天的檔案很多，結果會被快取"""
+    return (
+        f"{year:04d}",
+        f"{month:02d}",
+        f"{day:02d}",
+        f"{year:04d}-{month:02d}-{day:02d}",
+    )
+
+
+def _epoch_seconds(dt: datetime):
+    """將本地時間轉為 epoch 秒數；超出平台可表示的範圍 (如 0001 年) 時回傳 None
+    
+    本地時區不存在的時間 (夏令時間跳過的那一小時，例如相機時鐘沒調整) 仍會換算，
+    只是換回來的時間會差一小時；需要原樣還原時請另外檢查。
+    """
+    try:
+        return math.floor(dt.timestamp())
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _move_path(source: str, target: str):
+    """搬移檔案：同一檔案系統直接 rename（單一 syscall），跨裝置才退回 shutil.move"""
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, target)
+
+
 class PhotoOrganizer:
     """主要的照片整理類別"""
     
-    # 支援的檔案格式
-    PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.JPG', '.JPEG'}
-    VIDEO_EXTENSIONS = {'.mp4', '.MP4', '.mov', '.MOV'}
+    # 支援的檔案格式（小寫，比對前先將副檔名轉小寫）
+    PHOTO_EXTENSIONS = frozenset({'.jpg', '.jpeg'})
+    VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov'})
+    # 副檔名 -> 檔案類型，掃描時一次查表即可分類
+    EXT_TYPE = {**dict.fromkeys(PHOTO_EXTENSIONS, 'photo'),
+                **dict.fromkeys(VIDEO_EXTENSIONS, 'video')}
+    
+    # exiftool 參數: -n 不格式化數值，-S 縮短輸出，只讀取需要的 tag
+    EXIFTOOL_ARGS = ['-json', '-n', '-S', '-DateTimeOriginal', '-CreateDate',
+                     '-FileModifyDate', '-Model']
+    
+    # 每次 exiftool 批次呼叫最多處理的檔案數
+    EXIF_BATCH_SIZE = 200
+    
+    # 索引資料表的欄位（也是 JSON 匯出時的欄位名稱）
+    INDEX_COLUMNS = ('original_name', 'new_name', 'path', 'thumbnail',
+                     'datetime', 'type', 'size_bytes', 'camera')
+    _INSERT_FILE_SQL = f"INSERT OR REPLACE INTO files VALUES ({', '.join('?' * len(INDEX_COLUMNS))})"
     
     def __init__(self, input_dir: Path, output_dir: Path, dry_run: bool = False, 
-                 no_thumbnail: bool = False, logger: ProgressLogger = None):
+                 no_thumbnail: bool = False, logger: ProgressLogger = None,
+                 export_json: bool = False):
         self.input_dir = input_dir
         self.output_dir = output_dir
+        self._output_dir_str = str(output_dir)  # 組合目標路徑時用字串，避免大量建立 Path
         self.dry_run = dry_run
         self.no_thumbnail = no_thumbnail
         self.logger = logger
+        self.export_json = export_json  # 是否另外匯出 _index.json
+        # log 等級在執行期間不會改變，只檢查一次
+        self._debug_enabled = logger is not None and logger.is_debug_enabled()
         self.files_to_process = []  # 儲存掃描到的檔案資訊
+        self._index_path = output_dir / '_index.sqlite'
+        self._json_import_attempted = False  # 本次執行是否已嘗試匯入舊版 _index.json
+        self._dir_names = {}  # 目標資料夾 -> 已存在的檔名，避免每次搬移都 stat
+        self._exif_cache_path = output_dir / '_exif_cache.json'
+        self._exif_cache = None  # 大小:修改時間:檔名 -> EXIF 結果
     
     def scan_files(self) -> list:
         """掃描輸入資料夾，找出所有照片和影片"""
         files = []
-        all_extensions = self.PHOTO_EXTENSIONS | self.VIDEO_EXTENSIONS
-        
-        # 遞迴掃描所有檔案
-        for file_path in self.input_dir.rglob('*'):
-            if file_path.is_file() and file_path.suffix in all_extensions:
-                # 跳過 macOS 的 ._ 開頭檔案
-                if file_path.name.startswith('._'):
-                    continue
-                
-                file_type = 'photo' if file_path.suffix in self.PHOTO_EXTENSIONS else 'video'
-                files.append({
-                    'path': file_path,
-                    'type': file_type,
-                    'original_name': file_path.name,
-                    'size': file_path.stat().st_size,
-                })
         
-        self.logger.info(f"找到 {len([f for f in files if f['type'] == 'photo'])} 張照片")
-        self.logger.info(f"找到 {len([f for f in files if f['type'] == 'video'])} 部影片")
+        type_counts = {'photo': 0, 'video': 0}
+        ext_type = self.EXT_TYPE
+        
+        # 遞迴掃描所有檔案（os.scandir 會快取檔案類型，比 rglob 少很多 syscall）
+        pending_dirs = [os.path.normpath(self.input_dir)]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                            continue
+                        
+                        name = entry.name
+                        # 跳過 macOS 的 ._ 開頭檔案
+                        if name.startswith('._'):
+                            continue
+                        
+                        # 副檔名不分大小寫 (.JPG, .Jpg 都算)
+                        dot = name.rfind('.')
+                        ext = name[dot:].lower()
+                        file_type = ext_type.get(ext)
+                        if file_type is None:
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        
+                        type_counts[file_type] += 1
+                        # 路徑一律以字串保存，熱迴圈中不再建立 Path 物件
+                        files.append({
+                            'path': entry.path,
+                            'type': file_type,
+                            'original_name': name,
+                            'stem': name[:dot],
+                            'suffix': name[dot:],
+                        })
+            except OSError as e:
+                self.logger.warning(f"無法讀取資料夾: {current_dir} - {e}")
+        
+        self.logger.info(f"找到 {type_counts['photo']} 張照片")
+        self.logger.info(f"找到 {type_counts['video']} 部影片")
         
         return files
     
-    def read_exif(self, file_path: Path) -> dict:
+    def read_exif(self, file_path: str) -> dict:
         """使用 exiftool 讀取檔案的 EXIF 資訊"""
-        import subprocess
-        import json
-        
+        file_name = os.path.basename(file_path)
         try:
             # 使用 exiftool 輸出 JSON 格式
             result = subprocess.run(
-                ['exiftool', '-json', '-DateTimeOriginal', '-CreateDate', 
-                 '-FileModifyDate', '-Model', str(file_path)],
+                ['exiftool', self._exiftool_speed_flag(file_path),
+                 *self.EXIFTOOL_ARGS, file_path],
                 capture_output=True,
                 text=True,
                 timeout=30
             )
             
             if result.returncode != 0:
-                self.logger.warning(f"exiftool 錯誤: {file_path.name}")
+                self.logger.warning(f"exiftool 錯誤: {file_name}")
                 return None
             
             data = json.loads(result.stdout)
             if not data:
                 return None
             
-            exif = data[0]
-            
-            # 優先使用 DateTimeOriginal，其次 CreateDate，最後 FileModifyDate
-            datetime_str = (
-                exif.get('DateTimeOriginal') or 
-                exif.get('CreateDate') or 
-                exif.get('FileModifyDate')
-            )
+            return self._parse_exif(data[0], file_name)
             
-            if not datetime_str:
-                self.logger.warning(f"無法取得拍攝時間: {file_path.name}")
-                return None
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"exiftool 超時: {file_name}")
+            return None
+        except Exception as e:
+            self.logger.error(f"讀取 EXIF 失敗: {file_name} - {e}")
+            return None
+    
+    def _exiftool_speed_flag(self, file_path: str) -> str:
+        """依檔案類型選擇 exiftool 的加速參數"""
+        # 照片用 -fast2 跳過 MakerNotes；影片的 CreateDate 可能在 mdat 之後，只能用 -fast
+        return '-fast2' if os.path.splitext(file_path)[1].lower() in self.PHOTO_EXTENSIONS else '-fast'
+    
+    def read_exif_batch(self, paths: list, progress=None, exif_map: dict = None) -> dict:
+        """批次讀取多個檔案的 EXIF，回傳 {路徑: EXIF 資訊}
+        
+        檔案會切成多個批次，由多個子行程各自呼叫 exiftool 平行處理。
+        沒有出現在結果中的檔案代表 exiftool 沒有回傳資料，可改用 read_exif 逐一重試。
+        progress 可傳入 tqdm 進度條，每完成一個批次更新一次。
+        exif_map 可傳入既有的 dict，結果會逐批寫入，中途中斷時仍保留已完成的部分。
+        """
+        if exif_map is None:
+            exif_map = {}
+        if not paths:
+            return exif_map
+        
+        # 照片與影片使用不同的加速參數，分開批次
+        groups = {}
+        for file_path in paths:
+            groups.setdefault(self._exiftool_speed_flag(file_path), []).append(file_path)
+        
+        # 平均分給每個 CPU，但每批不超過 EXIF_BATCH_SIZE，讓進度條能持續更新
+        workers = os.cpu_count() or 1
+        batches = []
+        for speed_flag, group in groups.items():
+            size = min(self.EXIF_BATCH_SIZE, math.ceil(len(group) / workers))
+            for i in range(0, len(group), size):
+                batches.append((group[i:i + size], speed_flag))
+        
+        chunks = [batch[0] for batch in batches]
+        flags = [batch[1] for batch in batches]
+        args = [self.EXIFTOOL_ARGS] * len(batches)
+        
+        # 只有一批時不需要啟動子行程
+        executor = None
+        if len(batches) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(batches)))
+            results = executor.map(_run_exiftool_batch, chunks, flags, args)
+        else:
+            results = map(_run_exiftool_batch, chunks, flags, args)
+        
+        try:
+            for chunk, (data, error) in zip(chunks, results):
+                if error:
+                    self.logger.error(f"exiftool 批次讀取失敗 ({len(chunk)} 個檔案): {error}")
+                
+                # exiftool 回傳的 SourceFile 可能與傳入的寫法不同 (分隔符號、開頭的 ./)，
+                # 兩邊都正規化後對回原本傳入的路徑，結果的 key 才會與掃描到的路徑一致
+                sent = {os.path.normpath(p): p for p in chunk}
+                for exif in data:
+                    source = exif.get('SourceFile')
+                    if not source:
+                        continue
+                    source = os.path.normpath(source)
+                    exif_map[sent.get(source, source)] = self._parse_exif(
+                        exif, os.path.basename(source)
+                    )
+                
+                if progress is not None:
+                    progress.update(len(chunk))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        
+        return exif_map
+    
+    def _exif_cache_key(self, file_info: dict) -> str:
+        """以檔案大小、修改時間和檔名組成 EXIF 快取的 key（需先由 run() 填入 size/mtime）"""
+        if file_info['size'] is None:
+            return None
+        return f"{file_info['size']}:{int(file_info['mtime'])}:{file_info['original_name']}"
+    
+    def _load_exif_cache(self) -> dict:
+        """讀取 _exif_cache.json（上次執行的 EXIF 結果）"""
+        if self._exif_cache is not None:
+            return self._exif_cache
+        
+        self._exif_cache = {}
+        if self._exif_cache_path.exists():
+            try:
+                self._exif_cache = _read_json(self._exif_cache_path)
+                self.logger.debug(f"讀取 EXIF 快取: {len(self._exif_cache)} 筆")
+            except Exception as e:
+                self.logger.warning(f"讀取 EXIF 快取失敗，將重新建立: {e}")
+        
+        return self._exif_cache
+    
+    def _save_exif_cache(self, files: list, exif_map: dict):
+        """將成功讀取的 EXIF 結果寫回 _exif_cache.json
+        
+        只保留本次掃描到的檔案：已搬進照片庫的檔案之後不會再出現在輸入資料夾，
+        留著只會讓快取越來越大。沒有新增或移除任何記錄時不重寫檔案。
+        """
+        old_cache = self._load_exif_cache()
+        exif_cache = {}
+        added = False
+        
+        for file_info in files:
+            key = file_info.get('exif_key')
+            if not key:
+                continue
+            if key in old_cache:
+                exif_cache[key] = old_cache[key]
+                continue
             
-            # 解析日期時間 (格式: "2025:02:26 07:41:04" 或帶時區)
-            # 用 regex 移除時區後綴 (如 +08:00 或 -05:00)
-            import re
-            datetime_str = re.sub(r'[+-]\d{2}:\d{2}$', '', datetime_str.strip())
+            exif = exif_map.get(file_info['path'])
+            if not exif:
+                continue
             
-            # 嘗試解析
-            try:
-                # 格式: "2025:02:26 07:41:04"
-                dt = datetime.strptime(datetime_str.strip(), '%Y:%m:%d %H:%M:%S')
-            except ValueError:
-                try:
-                    # 格式: "2025-02-26 07:41:04"
-                    dt = datetime.strptime(datetime_str.strip(), '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    self.logger.warning(f"無法解析日期格式: {datetime_str} ({file_path.name})")
-                    return None
+            # 與索引相同，以 epoch 秒數儲存；無法原樣還原的時間 (如夏令時間跳過的那一小時)
+            # 不快取，下次直接重讀 EXIF
+            timestamp = _epoch_seconds(exif['datetime'])
+            if timestamp is None or datetime.fromtimestamp(timestamp) != exif['datetime']:
+                continue
             
-            return {
-                'datetime': dt,
-                'camera': exif.get('Model', 'Unknown'),
+            exif_cache[key] = {
+                'datetime': timestamp,
+                'camera': exif['camera'],
             }
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"exiftool 超時: {file_path.name}")
-            return None
+            added = True
+        
+        self._exif_cache = exif_cache
+        if not added and len(exif_cache) == len(old_cache):
+            return
+        
+        try:
+            _write_json(self._exif_cache_path, exif_cache)
         except Exception as e:
-            self.logger.error(f"讀取 EXIF 失敗: {file_path.name} - {e}")
+            self.logger.warning(f"寫入 EXIF 快取失敗: {e}")
+    
+    def _parse_exif(self, exif: dict, file_name: str) -> dict:
+        """從 exiftool 的 JSON 結果取出拍攝時間與相機型號"""
+        # 優先使用 DateTimeOriginal，其次 CreateDate，最後 FileModifyDate
+        datetime_str = (
+            exif.get('DateTimeOriginal') or 
+            exif.get('CreateDate') or 
+            exif.get('FileModifyDate')
+        )
+        
+        if not datetime_str:
+            self.logger.warning(f"無法取得拍攝時間: {file_name}")
+            return None
+        
+        # 解析日期時間 (格式: "2025:02:26 07:41:04"、"2025-02-26 07:41:04"，可能帶時區)
+        # 時區後綴 (如 +08:00) 不在 regex 內，match 只比對開頭即可忽略
+        datetime_str = str(datetime_str).strip()
+        match = DATE_RE.match(datetime_str)
+        try:
+            if not match:
+                raise ValueError(datetime_str)
+            dt = datetime(int(match[1]), int(match[2]), int(match[3]),
+                          int(match[4]), int(match[5]), int(match[6]))
+            # 索引與快取以 epoch 秒數儲存，超出平台範圍的年份 (如 0001、9999) 視為無效
+            dt.timestamp()
+        except (ValueError, OverflowError, OSError):
+            # 格式不符或日期無效 (如 "0000:00:00 00:00:00")
+            self.logger.warning(f"無法解析日期格式: {datetime_str} ({file_name})")
             return None
+        
+        return {
+            'datetime': dt,
+            'camera': exif.get('Model', 'Unknown'),
+        }
     
     def run(self):
         """執行整理流程"""
@@ -201,139 +516,213 @@ class PhotoOrganizer:
             self.logger.warning("沒有找到任何照片或影片")
             return
         
+        # 統計一次照片/影片數量，後續摘要直接沿用
+        photo_count = sum(1 for f in files if f['type'] == 'photo')
+        video_count = len(files) - photo_count
+        
         # Phase 2: 讀取 EXIF
         print("\n📷 讀取 EXIF 資訊中...")
-        try:
-            from tqdm import tqdm
-            file_iterator = tqdm(files, desc="讀取 EXIF", unit="檔案")
-        except ImportError:
+        
+        # 先查詢上次執行留下的快取，只對沒看過的檔案呼叫 exiftool
+        exif_cache = self._load_exif_cache()
+        exif_map = {}
+        pending_paths = []
+        for file_info in files:
+            # 每個檔案只 stat 一次：大小與修改時間供快取 key、mtime 備用時間與索引使用
+            # （搬移是 rename，不會改變大小）
+            try:
+                stat = os.stat(file_info['path'])
+                file_info['size'], file_info['mtime'] = stat.st_size, stat.st_mtime
+            except OSError:
+                file_info['size'] = file_info['mtime'] = None
+            
+            file_info['exif_key'] = self._exif_cache_key(file_info)
+            cached = exif_cache.get(file_info['exif_key'])
+            if cached:
+                # 快取記錄的是 epoch 秒數
+                exif_map[file_info['path']] = {
+                    'datetime': datetime.fromtimestamp(cached['datetime']),
+                    'camera': cached['camera'],
+                }
+            else:
+                pending_paths.append(file_info['path'])
+        
+        if exif_map:
+            self.logger.info(f"EXIF 快取命中 {len(exif_map)} 個檔案")
+        
+        if TQDM_AVAILABLE:
+            progress = tqdm(total=len(pending_paths), desc="讀取 EXIF", unit="檔案",
+                            mininterval=0.5)
+        else:
             self.logger.warning("tqdm 未安裝，使用簡單進度顯示")
-            file_iterator = files
+            progress = None
+        
+        # 平行批次讀取其餘檔案；中斷時也會把已讀到的結果寫回快取
+        try:
+            self.read_exif_batch(pending_paths, progress, exif_map)
+            
+            for file_info in files:
+                if file_info['path'] not in exif_map:
+                    # 批次結果缺少此檔案，個別重試
+                    exif_map[file_info['path']] = self.read_exif(file_info['path'])
+        finally:
+            if progress is not None:
+                progress.close()
+            self._save_exif_cache(files, exif_map)
         
-        for file_info in file_iterator:
-            exif = self.read_exif(file_info['path'])
+        dates = set()
+        for file_info in files:
+            exif = exif_map[file_info['path']]
             if exif:
                 file_info['datetime'] = exif['datetime']
                 file_info['camera'] = exif['camera']
                 file_info['new_name'] = self._generate_new_filename(file_info)
-                self.logger.debug(f"{file_info['original_name']} -> {file_info['new_name']}")
+                if self._debug_enabled:
+                    self.logger.debug(f"{file_info['original_name']} -> {file_info['new_name']}")
             else:
                 # 使用檔案修改時間作為備用
-                mtime = datetime.fromtimestamp(file_info['path'].stat().st_mtime)
+                mtime = datetime.fromtimestamp(
+                    file_info['mtime'] or os.stat(file_info['path']).st_mtime
+                )
                 file_info['datetime'] = mtime
                 file_info['camera'] = 'Unknown'
                 file_info['new_name'] = self._generate_new_filename(file_info)
                 self.logger.warning(f"使用檔案修改時間: {file_info['original_name']}")
+            
+            dt = file_info['datetime']
+            dates.add(_date_parts(dt.year, dt.month, dt.day)[3])
         
         self.files_to_process = files
         
         # 顯示掃描結果摘要
         print(f"\n✅ 掃描完成！")
-        dates = set(f['datetime'].strftime('%Y-%m-%d') for f in files if 'datetime' in f)
         print(f"   跨越 {len(dates)} 個日期: {min(dates)} ~ {max(dates)}")
         
-        # Phase 3: 搬移檔案
+        # Phase 3: 搬移檔案、產生縮圖、建立索引記錄
+        # 每個檔案一次處理完，縮圖在檔案剛搬移、還在 page cache 時就產生
         print(f"\n📦 {'[DRY-RUN] 模擬' if self.dry_run else ''}搬移檔案中...")
         moved_count = 0
+        thumb_count = 0
+        index_rows = []
+        pending_thumbs = []  # (file_info, 縮圖 future)
+        make_thumbnails = not self.no_thumbnail and not self.dry_run
         
-        for file_info in files:
-            target_path = self._generate_target_path(file_info)
-            file_info['target_path'] = target_path
-            
-            if self.dry_run:
-                self.logger.debug(f"[DRY-RUN] {file_info['original_name']} -> {target_path}")
-            else:
-                success = self.move_file(file_info)
-                if success:
+        if TQDM_AVAILABLE and not self.dry_run:
+            file_iterator = tqdm(files, desc="整理檔案", unit="檔案", mininterval=0.5)
+        else:
+            file_iterator = files
+        
+        # Pillow 解碼與縮放時會釋放 GIL，用 thread pool 即可平行處理
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            try:
+                for file_info in file_iterator:
+                    target_path = self._generate_target_path(file_info)
+                    file_info['target_path'] = target_path
+                    
+                    if self.dry_run:
+                        if self._debug_enabled:
+                            self.logger.debug(f"[DRY-RUN] {file_info['original_name']} -> {target_path}")
+                        continue
+                    
+                    if not self.move_file(file_info):
+                        continue
+                    
                     moved_count += 1
                     if file_info['type'] == 'photo':
                         self.logger.stats['photos_processed'] += 1
                     else:
                         self.logger.stats['videos_processed'] += 1
-            
-            # 簡單進度顯示
-            if not self.dry_run and moved_count % 100 == 0 and moved_count > 0:
-                print(f"   已處理 {moved_count} 個檔案...")
+                    
+                    if make_thumbnails and file_info['type'] == 'photo':
+                        future = executor.submit(self.generate_thumbnail, file_info['target_path'])
+                        pending_thumbs.append((file_info, future))
+                    else:
+                        index_rows.append(self._index_row(file_info))
+                    
+                    # 簡單進度顯示（沒有 tqdm 時）
+                    if not TQDM_AVAILABLE and moved_count % 100 == 0:
+                        print(f"   已處理 {moved_count} 個檔案...")
+                
+                # 等縮圖完成後再補上照片的索引記錄
+                for file_info, future in pending_thumbs:
+                    has_thumbnail = future.result()
+                    if has_thumbnail:
+                        thumb_count += 1
+                    index_rows.append(self._index_row(file_info, has_thumbnail))
+            except BaseException:
+                # 搬移比縮圖快很多，中斷時大部分縮圖可能還在排隊；取消它們，只等正在執行的
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
         
         if self.dry_run:
             # Dry-run 模式顯示會做什麼
             print(f"\n📋 [DRY-RUN] 計畫摘要:")
-            print(f"   將處理 {len([f for f in files if f['type'] == 'photo'])} 張照片")
-            print(f"   將處理 {len([f for f in files if f['type'] == 'video'])} 部影片")
+            print(f"   將處理 {photo_count} 張照片")
+            print(f"   將處理 {video_count} 部影片")
             
             # 顯示前 5 個範例
             print(f"\n   範例 (前 5 個):")
             for f in files[:5]:
                 print(f"   📄 {f['original_name']}")
                 print(f"      -> {f['target_path']}")
+            
+            if not self.no_thumbnail:
+                print(f"\n🖼️  [DRY-RUN] 將產生 {photo_count} 個縮圖")
         else:
             print(f"\n✅ 搬移完成！共處理 {moved_count} 個檔案")
+            if make_thumbnails:
+                print(f"✅ 縮圖產生完成！共 {thumb_count} 個")
         
-        # Phase 4: 產生縮圖
-        if not self.no_thumbnail and not self.dry_run:
-            print(f"\n🖼️  產生縮圖中...")
-            thumb_count = 0
-            photo_files = [f for f in files if f['type'] == 'photo']
-            
-            for file_info in photo_files:
-                if 'target_path' in file_info:
-                    success = self.generate_thumbnail(file_info['target_path'])
-                    if success:
-                        thumb_count += 1
-                    
-                    if thumb_count % 100 == 0 and thumb_count > 0:
-                        print(f"   已產生 {thumb_count} 個縮圖...")
-            
-            print(f"✅ 縮圖產生完成！共 {thumb_count} 個")
-        elif self.dry_run:
-            photo_count = len([f for f in files if f['type'] == 'photo'])
-            print(f"\n🖼️  [DRY-RUN] 將產生 {photo_count} 個縮圖")
-        
-        # Phase 5: 產生 JSON 索引
+        # Phase 4: 一次寫入索引
+        index_changed = False
         if not self.dry_run:
             print(f"\n📋 更新索引中...")
-            self.update_index(files)
-            print(f"✅ 索引更新完成: _index.json")
+            index_changed = self.update_index(index_rows)
+            print(f"✅ 索引更新完成: _index.sqlite")
         else:
-            print(f"\n📋 [DRY-RUN] 將更新 _index.json")
+            print(f"\n📋 [DRY-RUN] 將更新 _index.sqlite")
         
         self.logger.info(f"{mode}整理完成！")
         
-        # Phase 6: 互動式事件命名（僅非 dry-run 模式）
+        # Phase 5: 互動式事件命名（僅非 dry-run 模式）
         if not self.dry_run and files:
-            self.interactive_event_naming(files)
+            if self.interactive_event_naming(files):
+                index_changed = True
+        
+        # 檔案與事件都寫入資料庫後才匯出 _index.json，沒有變更時不重寫
+        if self.export_json and index_changed:
+            self.export_json_index()
     
-    def _generate_target_path(self, file_info: dict) -> Path:
+    def _generate_target_path(self, file_info: dict) -> str:
         """計算檔案的目標路徑"""
         dt = file_info['datetime']
         file_type = file_info['type']
         
         # 結構: YYYY/MM/YYYY-MM-DD/photos/ 或 videos/
-        date_folder = dt.strftime('%Y-%m-%d')
+        year, month, _, date_folder = _date_parts(dt.year, dt.month, dt.day)
         type_folder = 'photos' if file_type == 'photo' else 'videos'
         
-        target_dir = self.output_dir / dt.strftime('%Y') / dt.strftime('%m') / date_folder / type_folder
-        target_path = target_dir / file_info['new_name']
-        
-        return target_path
+        return os.path.join(self._output_dir_str, year, month, date_folder,
+                            type_folder, file_info['new_name'])
     
     def move_file(self, file_info: dict) -> bool:
         """搬移並重新命名檔案"""
-        import shutil
-        
         source = file_info['path']
         target = file_info['target_path']
         
         try:
-            # 建立目標資料夾
-            target.parent.mkdir(parents=True, exist_ok=True)
+            # 建立目標資料夾並取得已存在的檔名
+            existing_names = self._target_names(os.path.dirname(target))
             
             # 檢查檔名衝突
-            final_target = self._resolve_collision(target)
+            final_target = self._resolve_collision(target, existing_names)
             
             # 搬移檔案
-            shutil.move(str(source), str(final_target))
-            self.logger.debug(f"已搬移: {source.name} -> {final_target}")
+            _move_path(source, final_target)
+            existing_names.add(os.path.basename(final_target).lower())
+            file_info['target_path'] = final_target
+            if self._debug_enabled:
+                self.logger.debug(f"已搬移: {file_info['original_name']} -> {final_target}")
             
             # 處理 sidecar 檔案 (影片的 XML)
             if file_info['type'] == 'video':
@@ -342,196 +731,254 @@ class PhotoOrganizer:
             return True
             
         except Exception as e:
-            self.logger.error(f"搬移失敗: {source.name} - {e}")
+            self.logger.error(f"搬移失敗: {file_info['original_name']} - {e}")
             return False
     
-    def _resolve_collision(self, target: Path) -> Path:
+    def _target_names(self, target_dir: str) -> set:
+        """取得目標資料夾內已使用的檔名（小寫），每個資料夾只建立與列出一次"""
+        names = self._dir_names.get(target_dir)
+        if names is None:
+            os.makedirs(target_dir, exist_ok=True)
+            # 用小寫比對，避免在不分大小寫的檔案系統 (macOS) 上覆蓋檔案
+            names = {name.lower() for name in os.listdir(target_dir)}
+            self._dir_names[target_dir] = names
+        return names
+    
+    def _resolve_collision(self, target: str, existing_names: set) -> str:
         """解決檔名衝突，加上 _1, _2 等後綴"""
-        if not target.exists():
+        parent, name = os.path.split(target)
+        if name.lower() not in existing_names:
             return target
         
-        stem = target.stem
-        suffix = target.suffix
-        parent = target.parent
+        stem, suffix = os.path.splitext(name)
         
         counter = 1
         while True:
             new_name = f"{stem}_{counter}{suffix}"
-            new_target = parent / new_name
-            if not new_target.exists():
+            if new_name.lower() not in existing_names:
                 self.logger.warning(f"檔名衝突，重新命名為: {new_name}")
-                return new_target
+                return os.path.join(parent, new_name)
             counter += 1
             if counter > 100:  # 防止無限迴圈
                 raise Exception(f"無法解決檔名衝突: {target}")
     
-    def _move_sidecar(self, source: Path, target: Path):
+    def _move_sidecar(self, source: str, target: str):
         """搬移影片的 sidecar 檔案 (XML)"""
-        import shutil
-        
         # Sony 影片的 sidecar 格式: C0001.MP4 -> C0001M01.XML
-        source_stem = source.stem
-        sidecar_pattern = f"{source_stem}M01.XML"
-        sidecar_source = source.parent / sidecar_pattern
+        source_stem = os.path.splitext(source)[0]
+        sidecar_source = f"{source_stem}M01.XML"
         
-        if sidecar_source.exists():
+        if os.path.exists(sidecar_source):
             # 產生對應的 sidecar 目標名稱
-            target_stem = target.stem
-            sidecar_target = target.parent / f"{target_stem}M01.XML"
+            target_dir, target_name = os.path.split(target)
+            sidecar_name = f"{os.path.splitext(target_name)[0]}M01.XML"
+            sidecar_target = os.path.join(target_dir, sidecar_name)
             
             try:
-                shutil.move(str(sidecar_source), str(sidecar_target))
-                self.logger.debug(f"已搬移 sidecar: {sidecar_source.name}")
+                _move_path(sidecar_source, sidecar_target)
+                self._target_names(target_dir).add(sidecar_name.lower())
+                if self._debug_enabled:
+                    self.logger.debug(f"已搬移 sidecar: {os.path.basename(sidecar_source)}")
             except Exception as e:
-                self.logger.warning(f"搬移 sidecar 失敗: {sidecar_source.name} - {e}")
+                self.logger.warning(f"搬移 sidecar 失敗: {os.path.basename(sidecar_source)} - {e}")
     
-    def generate_thumbnail(self, source_path: Path, max_width: int = 300) -> bool:
+    def _thumbnail_path(self, source_path: str) -> str:
+        """計算照片對應的縮圖路徑: YYYY-MM-DD/thumbnails/<檔名>_thumb.jpg"""
+        photos_dir, name = os.path.split(source_path)
+        return os.path.join(os.path.dirname(photos_dir), 'thumbnails',
+                            os.path.splitext(name)[0] + '_thumb.jpg')
+    
+    def generate_thumbnail(self, source_path: str, max_width: int = 300) -> bool:
         """產生縮圖，使用 macOS sips 或 Pillow"""
-        import subprocess
-        import shutil
-        
         # 計算縮圖路徑
-        thumb_dir = source_path.parent.parent / 'thumbnails'
-        thumb_name = source_path.stem + '_thumb.jpg'
-        thumb_path = thumb_dir / thumb_name
+        thumb_path = self._thumbnail_path(source_path)
+        thumb_dir, thumb_name = os.path.split(thumb_path)
+        source_name = os.path.basename(source_path)
         
         try:
             # 建立縮圖資料夾
-            thumb_dir.mkdir(parents=True, exist_ok=True)
+            os.makedirs(thumb_dir, exist_ok=True)
             
-            # 嘗試使用 Pillow
-            try:
-                from PIL import Image
+            # 優先使用 Pillow
+            if PIL_AVAILABLE:
                 with Image.open(source_path) as img:
                     # 計算縮放比例
                     ratio = max_width / img.width
                     new_height = int(img.height * ratio)
                     
-                    # 縮放並儲存
-                    img_resized = img.resize((max_width, new_height), Image.LANCZOS)
+                    # JPEG 可在解碼時直接縮小為 1/2、1/4、1/8，省下大部分解碼工作
+                    img.draft('RGB', (max_width * 2, new_height * 2))
+                    
+                    # 縮放並儲存（300px 縮圖用 BILINEAR 與 LANCZOS 看不出差異）
+                    img_resized = img.resize((max_width, new_height), Image.BILINEAR)
                     img_resized.save(thumb_path, 'JPEG', quality=85)
                     
-                self.logger.debug(f"已產生縮圖 (Pillow): {thumb_name}")
+                if self._debug_enabled:
+                    self.logger.debug(f"已產生縮圖 (Pillow): {thumb_name}")
                 return True
-                
-            except ImportError:
-                # Pillow 未安裝，使用 macOS sips
-                pass
-            
-            # Fallback: 使用 macOS sips
-            # 先複製原始檔案
-            shutil.copy2(str(source_path), str(thumb_path))
             
-            # 使用 sips 縮放
+            # Fallback: Pillow 未安裝，使用 macOS sips
+            # 直接讀原始檔、以 --out 寫出縮圖，不必先複製一份完整大小的檔案
             result = subprocess.run(
-                ['sips', '-Z', str(max_width), str(thumb_path)],
+                ['sips', '-Z', str(max_width), source_path, '--out', thumb_path],
                 capture_output=True,
                 text=True,
                 timeout=30
             )
             
             if result.returncode == 0:
-                self.logger.debug(f"已產生縮圖 (sips): {thumb_name}")
+                if self._debug_enabled:
+                    self.logger.debug(f"已產生縮圖 (sips): {thumb_name}")
                 return True
             else:
-                self.logger.warning(f"sips 失敗: {source_path.name}")
+                self.logger.warning(f"sips 失敗: {source_name}")
                 # 刪除失敗的檔案
-                if thumb_path.exists():
-                    thumb_path.unlink()
+                if os.path.exists(thumb_path):
+                    os.remove(thumb_path)
                 return False
                 
         except Exception as e:
-            self.logger.warning(f"產生縮圖失敗: {source_path.name} - {e}")
+            self.logger.warning(f"產生縮圖失敗: {source_name} - {e}")
             return False
     
-    def update_index(self, files: list):
-        """更新 _index.json 索引檔"""
-        import json
+    def _connect_index(self) -> sqlite3.Connection:
+        """開啟 _index.sqlite 索引資料庫，尚未匯入舊版 _index.json 時先匯入"""
+        conn = sqlite3.connect(self._index_path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'original_name TEXT PRIMARY KEY, new_name TEXT, path TEXT, thumbnail TEXT, '
+            'datetime INTEGER, type TEXT, size_bytes INTEGER, camera TEXT)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS files_datetime ON files (datetime)')
+        conn.execute('CREATE TABLE IF NOT EXISTS events (date TEXT PRIMARY KEY, name TEXT)')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
         
-        index_path = self.output_dir / '_index.json'
+        # 匯入成功才記錄在 meta；讀取失敗時下次執行會再試，每次執行只試一次
+        if not self._json_import_attempted and not self._json_imported(conn):
+            self._json_import_attempted = True
+            if self._import_json_index(conn):
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('json_imported', '1')")
+        conn.commit()
+        return conn
+    
+    def _json_imported(self, conn: sqlite3.Connection) -> bool:
+        """舊版 _index.json 是否已匯入（或不存在）"""
+        return conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is not None
+    
+    def _import_json_index(self, conn: sqlite3.Connection) -> bool:
+        """將舊版 _index.json 的檔案與事件記錄匯入資料庫，回傳是否完成（沒有舊版索引也算完成）"""
+        json_path = self.output_dir / '_index.json'
+        if not json_path.exists():
+            return True
         
-        # 讀取現有索引（如果存在）
-        existing_index = {
-            'last_updated': None,
-            'total_photos': 0,
-            'total_videos': 0,
-            'files': [],
-            'events': {}
-        }
+        try:
+            old_index = _read_json(json_path)
+        except Exception as e:
+            self.logger.warning(f"讀取舊版索引失敗，下次執行時再匯入: {e}")
+            return False
         
-        if index_path.exists():
-            try:
-                with open(index_path, 'r', encoding='utf-8') as f:
-                    existing_index = json.load(f)
-                self.logger.debug(f"讀取現有索引: {len(existing_index.get('files', []))} 個檔案")
-            except Exception as e:
-                self.logger.warning(f"讀取索引失敗，將重新建立: {e}")
+        rows = []
+        for record in old_index.get('files', []):
+            # 舊版索引的 datetime 為 ISO 字串，統一轉成 epoch 秒數
+            if isinstance(record.get('datetime'), str):
+                try:
+                    record['datetime'] = _epoch_seconds(datetime.fromisoformat(record['datetime']))
+                except ValueError:
+                    record['datetime'] = None
+            rows.append(tuple(record.get(column) for column in self.INDEX_COLUMNS))
         
-        # 建立現有檔案的快速查找表（用原始檔名作為 key）
-        existing_files = {f['original_name']: f for f in existing_index.get('files', [])}
+        conn.executemany(self._INSERT_FILE_SQL, rows)
+        conn.executemany('INSERT OR REPLACE INTO events VALUES (?, ?)',
+                         old_index.get('events', {}).items())
+        self.logger.info(f"已從 _index.json 匯入 {len(rows)} 筆索引記錄")
+        return True
+    
+    def _index_row(self, file_info: dict, has_thumbnail: bool = False) -> tuple:
+        """產生已搬移檔案的索引記錄，欄位順序同 INDEX_COLUMNS"""
+        # 計算相對路徑和縮圖路徑
+        # 目標路徑都由 output_dir 組合而成，直接去掉前綴即為相對路徑
+        target_path = file_info['target_path']
+        prefix_len = len(os.path.join(self._output_dir_str, ''))
+        rel_path = target_path[prefix_len:]
         
-        # 新增/更新檔案記錄
-        for file_info in files:
-            if 'target_path' not in file_info:
-                continue
-            
-            # 計算相對路徑和縮圖路徑
-            target_path = file_info['target_path']
-            rel_path = str(target_path.relative_to(self.output_dir))
-            
-            thumb_path = None
-            if file_info['type'] == 'photo':
-                thumb_dir = target_path.parent.parent / 'thumbnails'
-                thumb_name = target_path.stem + '_thumb.jpg'
-                thumb_full = thumb_dir / thumb_name
-                if thumb_full.exists():
-                    thumb_path = str(thumb_full.relative_to(self.output_dir))
-            
-            file_record = {
-                'original_name': file_info['original_name'],
-                'new_name': file_info['new_name'],
-                'path': rel_path,
-                'thumbnail': thumb_path,
-                'datetime': file_info['datetime'].isoformat(),
-                'type': file_info['type'],
-                'size_bytes': file_info['size'],
-                'camera': file_info.get('camera', 'Unknown'),
-            }
-            
-            # 更新或新增
-            existing_files[file_info['original_name']] = file_record
-        
-        # 重建索引
-        all_files = list(existing_files.values())
-        all_files.sort(key=lambda x: x['datetime'])
-        
-        new_index = {
-            'last_updated': datetime.now().isoformat(),
-            'total_photos': len([f for f in all_files if f['type'] == 'photo']),
-            'total_videos': len([f for f in all_files if f['type'] == 'video']),
-            'files': all_files,
-            'events': existing_index.get('events', {})
-        }
+        thumb_path = None
+        if has_thumbnail:
+            thumb_path = self._thumbnail_path(target_path)[prefix_len:]
+        
+        # 大小在 run() 讀取 EXIF 前已取得；當時 stat 失敗才 stat 搬移後的檔案
+        size = file_info.get('size')
+        if size is None:
+            try:
+                size = os.stat(target_path).st_size
+            except OSError:
+                size = None
+        
+        return (
+            file_info['original_name'],
+            file_info['new_name'],
+            rel_path,
+            thumb_path,
+            _epoch_seconds(file_info['datetime']),
+            file_info['type'],
+            size,
+            file_info.get('camera', 'Unknown'),
+        )
+    
+    def update_index(self, rows: list) -> bool:
+        """將本次處理的檔案記錄 (見 _index_row) 寫入 _index.sqlite，只寫入新增/變更的記錄
         
-        # 寫入索引
+        _index.json 不在這裡匯出，由 run() 在事件命名之後統一匯出一次。
+        """
+        # 寫入索引（原始檔名為 primary key，已存在則更新）
         try:
-            with open(index_path, 'w', encoding='utf-8') as f:
-                json.dump(new_index, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"已更新索引: {len(all_files)} 個檔案")
+            with closing(self._connect_index()) as conn:
+                with conn:
+                    conn.executemany(self._INSERT_FILE_SQL, rows)
+                total = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+            self.logger.info(f"已更新索引: {len(rows)} 個檔案 (共 {total} 個)")
         except Exception as e:
             self.logger.error(f"寫入索引失敗: {e}")
+            return False
+        
+        return bool(rows)
     
-    def interactive_event_naming(self, files: list):
-        """互動式為日期加上事件名稱"""
-        import json
-        import shutil
+    def export_json_index(self):
+        """將索引匯出為 _index.json（與舊版格式相容，依拍攝時間排序）"""
+        index_path = self.output_dir / '_index.json'
         
+        try:
+            with closing(self._connect_index()) as conn:
+                if not self._json_imported(conn):
+                    # 舊版 _index.json 還沒成功匯入，匯出會蓋掉裡面的記錄
+                    self.logger.warning("舊版 _index.json 尚未匯入，略過匯出以免覆蓋")
+                    return
+                cursor = conn.execute(
+                    f"SELECT {', '.join(self.INDEX_COLUMNS)} FROM files ORDER BY datetime"
+                )
+                all_files = [dict(zip(self.INDEX_COLUMNS, row)) for row in cursor]
+                type_counts = dict(conn.execute('SELECT type, COUNT(*) FROM files GROUP BY type'))
+                events = dict(conn.execute('SELECT date, name FROM events'))
+            
+            _write_json(index_path, {
+                'last_updated': datetime.now().isoformat(),
+                'total_photos': type_counts.get('photo', 0),
+                'total_videos': type_counts.get('video', 0),
+                'files': all_files,
+                'events': events,
+            })
+            self.logger.info(f"已匯出 JSON 索引: {len(all_files)} 個檔案")
+        except Exception as e:
+            self.logger.error(f"匯出 JSON 索引失敗: {e}")
+    
+    def interactive_event_naming(self, files: list) -> bool:
+        """互動式為日期加上事件名稱，回傳是否有新增事件"""
         # 統計每個日期的檔案數量
         date_counts = {}
         for f in files:
             if 'datetime' not in f:
                 continue
-            date_str = f['datetime'].strftime('%Y-%m-%d')
+            dt = f['datetime']
+            date_str = _date_parts(dt.year, dt.month, dt.day)[3]
             if date_str not in date_counts:
                 date_counts[date_str] = {'photos': 0, 'videos': 0}
             if f['type'] == 'photo':
@@ -540,7 +987,7 @@ class PhotoOrganizer:
                 date_counts[date_str]['videos'] += 1
         
         if not date_counts:
-            return
+            return False
         
         print("\n" + "=" * 50)
         print("  📅 事件命名（選填）")
@@ -549,16 +996,13 @@ class PhotoOrganizer:
         print("  直接按 Enter 跳過，輸入 'q' 結束")
         print("=" * 50 + "\n")
         
-        # 讀取現有索引
-        index_path = self.output_dir / '_index.json'
+        # 讀取現有的事件名稱
         existing_events = {}
-        if index_path.exists():
-            try:
-                with open(index_path, 'r', encoding='utf-8') as f:
-                    idx = json.load(f)
-                    existing_events = idx.get('events', {})
-            except:
-                pass
+        try:
+            with closing(self._connect_index()) as conn:
+                existing_events = dict(conn.execute('SELECT date, name FROM events'))
+        except Exception as e:
+            self.logger.warning(f"讀取索引事件失敗: {e}")
         
         events_updated = False
         
@@ -603,21 +1047,19 @@ class PhotoOrganizer:
         # 更新索引中的事件
         if events_updated:
             try:
-                with open(index_path, 'r', encoding='utf-8') as f:
-                    idx = json.load(f)
-                idx['events'] = existing_events
-                with open(index_path, 'w', encoding='utf-8') as f:
-                    json.dump(idx, f, ensure_ascii=False, indent=2)
+                with closing(self._connect_index()) as conn:
+                    with conn:
+                        conn.executemany('INSERT OR REPLACE INTO events VALUES (?, ?)',
+                                         existing_events.items())
                 self.logger.info(f"已更新索引中的事件記錄")
             except Exception as e:
                 self.logger.warning(f"更新索引事件失敗: {e}")
         
         print()
+        return events_updated
     
     def _rename_date_folder(self, date_str: str, event_name: str):
         """將日期資料夾重新命名為包含事件名稱"""
-        import shutil
-        
         # 解析日期
         year, month, day = date_str.split('-')
         
@@ -641,10 +1083,12 @@ class PhotoOrganizer:
     def _generate_new_filename(self, file_info: dict) -> str:
         """產生新檔名: YYYYMMDD_HHMMSS_原始編號.副檔名"""
         dt = file_info['datetime']
-        original_stem = file_info['path'].stem  # 不含副檔名
-        suffix = file_info['path'].suffix.upper()  # 統一大寫副檔名
+        original_stem = file_info['stem']  # 不含副檔名
+        suffix = file_info['suffix'].upper()  # 統一大寫副檔名
         
-        return f"{dt.strftime('%Y%m%d_%H%M%S')}_{original_stem}{suffix}"
+        # 直接用 f-string 格式化，比 strftime 快
+        return (f"{dt.year:04d}{dt.month:02d}{dt.day:02d}_"
+                f"{dt.hour:02d}{dt.minute:02d}{dt.second:02d}_{original_stem}{suffix}")
 
 
 def parse_args():
@@ -687,6 +1131,19 @@ def parse_args():
         help='跳過縮圖產生'
     )
     
+    parser.add_argument(
+        '--export-json',
+        action='store_true',
+        help='另外匯出 _index.json（與舊版相容，檔案多時較慢）'
+    )
+    
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO'],
+        default='DEBUG',
+        help='organize.log 的記錄等級 (預設: DEBUG；INFO 不記錄每個檔案的細節，檔案多時較快)'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -705,6 +1162,12 @@ def main():
         print(f"❌ 錯誤: 輸入資料夾不存在: {args.input}")
         print(f"   請先建立資料夾並放入要整理的照片")
         sys.exit(1)
+    
+    # 驗證 exiftool 已安裝
+    if shutil.which('exiftool') is None:
+        print(f"❌ 錯誤: 找不到 exiftool")
+        print(f"   請先安裝 exiftool (macOS: brew install exiftool)")
+        sys.exit(1)
             
     # 確保輸出目錄存在
     if not args.output.exists():
@@ -712,7 +1175,8 @@ def main():
     
     # 初始化 logger
     log_file = args.output / 'organize.log'
-    logger = ProgressLogger(log_file, verbose=args.verbose)
+    logger = ProgressLogger(log_file, verbose=args.verbose,
+                            log_level=getattr(logging, args.log_level))
     
     # 顯示啟動資訊
     print("=" * 50)
@@ -732,7 +1196,8 @@ def main():
         output_dir=args.output,
         dry_run=args.dry_run,
         no_thumbnail=args.no_thumbnail,
-        logger=logger
+        logger=logger,
+        export_json=args.export_json
     )
     
     try: